@@ -1,9 +1,25 @@
+import errno
+import os
+import selectors
+import signal
 import socket
 import subprocess
 import time
+from functools import wraps
 
 
-def host_run(args: str) -> tuple:
+# Ports checked to determine whether a host is up, SSH and RDP.
+_PROBE_PORTS = (22, 3389)
+
+# Errors returned by a non-blocking connect_ex() that is still connecting.
+_CONNECT_IN_PROGRESS = {
+    errno.EINPROGRESS,
+    errno.EWOULDBLOCK,
+    getattr(errno, 'WSAEWOULDBLOCK', errno.EWOULDBLOCK),
+}
+
+
+def host_run(args: str, shell: bool = True) -> tuple:
     """Run shell commands on the host
 
     Both stdout and stderr are combined for convenience. Additionally,
@@ -24,8 +40,14 @@ def host_run(args: str) -> tuple:
 
     https://docs.python.org/3/library/subprocess.html
 
+    When shell features aren't needed, passing a sequence of program
+    arguments with shell=False executes the program directly. This
+    skips starting /bin/sh for every call, which can dominate the cost
+    of short-lived commands.
+
     Args:
         args: Arguments to execute.
+        shell: Whether to execute args through the shell.
 
     Returns:
         Tuple of output and return code.
@@ -34,13 +56,71 @@ def host_run(args: str) -> tuple:
         args,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
-        shell=True,
-        text=True
+        shell=shell,
+        text=True,
     )
 
     return res.stdout, res.returncode
 
 
+def host_run_iter(args: str, shell: bool = True) -> object:
+    """Run shell commands on the host, yielding output as it arrives.
+
+    Streaming variant of host_run() for long running commands or those
+    with large output. Lines are yielded as soon as the command writes
+    them rather than buffering everything until it exits, so callers can
+    process output incrementally or stop early. Stopping early, including
+    due to an exception such as KeyboardInterrupt, kills the command
+    along with any processes it started such as the other commands in a
+    pipeline.
+
+    The command runs in a new session to allow this, which detaches it
+    from the controlling terminal. Commands that prompt on the terminal,
+    such as sudo or ssh asking for a password, will fail.
+
+    The return code is the generator's return value, which is available
+    to callers using `yield from`.
+
+    Args:
+        args: Arguments to execute.
+        shell: Whether to execute args through the shell.
+
+    Returns:
+        Generator of output lines.
+    """
+    proc = subprocess.Popen(
+        args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        shell=shell,
+        text=True,
+        bufsize=1,
+        # Run in a new process group so the whole group can be killed,
+        # rather than just the shell.
+        start_new_session=True,
+    )
+
+    finished = False
+    try:
+        yield from proc.stdout
+        finished = True
+    finally:
+        if not finished:
+            # The caller stopped reading or an exception was raised.
+            # Being in its own session, the command doesn't get the
+            # terminal's SIGINT, so kill it rather than waiting for it.
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                # Everything in the group already exited.
+                pass
+
+        proc.stdout.close()
+        proc.wait()
+
+    return proc.returncode
+
+
 def failsafe(func) -> object:
     """Wraps functions into a try/except condition.
 
@@ -53,17 +133,46 @@ def failsafe(func) -> object:
         func: Function to wrap
 
     Returns:
-        Function wrapped in a try/except.
+        Function wrapped in a try/except. The wrapped function returns
+            the original return value, or None if an exception was
+            raised.
     """
+    # A plain closure is intentional. It is cheaper to call than an
+    # instance with __call__, and unlike functools.partial it still binds
+    # self when used to decorate methods.
+    @wraps(func)
     def wrapper(*args, **kwargs):
         try:
-            func(*args, **kwargs)
-        except:
-            pass
+            return func(*args, **kwargs)
+        except Exception:
+            return None
 
     return wrapper
 
 
+def _resolve(host: str) -> str:
+    """Resolves a hostname to an ip address.
+
+    wait_for_shutdown() checks the same host repeatedly and quickly, so
+    it resolves the host once up front to avoid a resolver round trip on
+    every check. The host is already up so its address won't change
+    before it goes down.
+
+    Args:
+        host: Host ip address or hostname.
+
+    Returns:
+        Host ip address, or host unchanged if it could not be resolved
+            so that each check retries the lookup.
+    """
+    try:
+        return socket.getaddrinfo(
+            host, None, socket.AF_INET, socket.SOCK_STREAM
+        )[0][4][0]
+    except OSError:
+        return host
+
+
 def is_host_reachable(host: str, port: int, timeout: int = 3) -> bool:
     """Checks if a host is reachable.
 
@@ -80,22 +189,79 @@ def is_host_reachable(host: str, port: int, timeout: int = 3) -> bool:
 
     """
     try:
-        # Uses timeout=3 by default to allow plenty of time for a socket to
-        # make a connection. This helps ensure we're not returning a false
-        # positive if we experience connection issues caused by network
-        # latency.
-        socket.setdefaulttimeout(timeout)
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-
-        # Try host connection.
-        sock.connect((host, port))
-        sock.close()
-        return True
-    except socket.error:
-        # Could not connect. Host may be down.
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            # Uses timeout=3 by default to allow plenty of time for a
+            # socket to make a connection. This helps ensure we're not
+            # returning a false positive if we experience connection
+            # issues caused by network latency. The timeout only applies
+            # to this socket, unlike setdefaulttimeout() which changes it
+            # for the whole process.
+            sock.settimeout(timeout)
+
+            # Try host connection. connect_ex() reports failures as an
+            # error code rather than raising, which is the common case
+            # while polling a host that is down.
+            return sock.connect_ex((host, port)) == 0
+    except OSError:
+        # Could not resolve the host.
         return False
 
 
+def _any_port_open(host: str, ports: tuple, timeout: int = 3) -> bool:
+    """Checks if any of several ports on a host are reachable.
+
+    Unlike calling is_host_reachable() once per port, connections to
+    every port are started at once and waited on together, so a host
+    that is down costs a single timeout rather than one per port.
+
+    Args:
+        host: Host ip address.
+        ports: Host ports to check.
+        timeout: Time to wait for a connection.
+
+    Returns:
+        Boolean indicating whether any port accepted a connection.
+    """
+    sel = selectors.DefaultSelector()
+    socks = []
+    try:
+        for port in ports:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            socks.append(sock)
+            sock.setblocking(False)
+
+            try:
+                err = sock.connect_ex((host, port))
+            except OSError:
+                # Could not resolve the host.
+                return False
+
+            if err == 0:
+                return True
+            elif err in _CONNECT_IN_PROGRESS:
+                sel.register(sock, selectors.EVENT_WRITE)
+
+        deadline = time.monotonic() + timeout
+        while sel.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            # A socket becomes writable once its connection attempt
+            # finishes, whether it succeeded or not.
+            for key, _ in sel.select(remaining):
+                sock = key.fileobj
+                if not sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR):
+                    return True
+                sel.unregister(sock)
+
+        return False
+    finally:
+        sel.close()
+        for sock in socks:
+            sock.close()
+
+
 def wait_for_shutdown(host: str, timeout=120) -> bool:
     """Waits for a host to go offline.
 
@@ -123,16 +289,23 @@ def wait_for_shutdown(host: str, timeout=120) -> bool:
             expected time. False often indicates the system failed
             to shutdown.
     """
-    time_start = time.time()
-
-    while time.time() - time_start <= timeout:
+    # Monotonic time isn't affected by system clock changes (i.e. NTP)
+    # which are common around reboots.
+    deadline = time.monotonic() + timeout
+    addr = _resolve(host)
+    # Start with a short delay between checks so a quick shutdown is
+    # still detected promptly, backing off to avoid spinning when the
+    # ports refuse connections immediately.
+    delay = 0.05
+
+    while time.monotonic() <= deadline:
         # Checks ports for SSH and RDP
-        if not any([
-            is_host_reachable(host, 22),
-            is_host_reachable(host, 3389),
-        ]):
+        if not _any_port_open(addr, _PROBE_PORTS):
             return True
 
+        time.sleep(delay)
+        delay = min(delay * 2, 1)
+
     return False
 
 
@@ -148,14 +321,13 @@ def wait_for_boot(host: str, timeout=300) -> bool:
             expected time. False often indicates the system failed
             to boot.
     """
-    time_start = time.time()
+    deadline = time.monotonic() + timeout
 
-    while time.time() - time_start <= timeout:
-        # Checks ports for SSH and RDP
-        if any([
-            is_host_reachable(host, 22),
-            is_host_reachable(host, 3389),
-        ]):
+    while time.monotonic() <= deadline:
+        # Checks ports for SSH and RDP. Stops at the first port that is
+        # up. The host is resolved on every check since it may come back
+        # with a new address (i.e. DHCP).
+        if any(is_host_reachable(host, i) for i in _PROBE_PORTS):
             return True
 
         time.sleep(15)
@@ -176,15 +348,19 @@ def wait_for_tunnel_boot(tunnel, timeout=300) -> bool:
         Boolean indicating whether the system booted in the expected
             time.
     """
-    time_start = time.time()
+    deadline = time.monotonic() + timeout
 
-    while time.time() - time_start <= timeout:
+    while time.monotonic() <= deadline:
         tunnel.check_tunnels()
         if tunnel.tunnel_is_up.get(
             tunnel.local_bind_address, False
         ):
             return True
 
+        # sshtunnel has no state change callback so we poll, but at a
+        # bounded rate rather than spinning a CPU core.
+        time.sleep(0.5)
+
     return False
 
 
@@ -202,13 +378,15 @@ def wait_for_tunnel_shutdown(tunnel, timeout=120):
             time.
 
     """
-    time_start = time.time()
+    deadline = time.monotonic() + timeout
 
-    while time.time() - time_start <= timeout:
+    while time.monotonic() <= deadline:
         tunnel.check_tunnels()
         if not tunnel.tunnel_is_up.get(
             tunnel.local_bind_address, False
         ):
             return True
 
+        time.sleep(0.5)
+
     return False
@@ -1,10 +1,275 @@
+import logging
+import os
+import posixpath
+import re
+import select
+import socket
+import socketserver
+import stat
+import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 import sshtunnel
 import paramiko
 from fabric import Connection, Config
 
 
+# Disable annoying debug output. This only affects paramiko's loggers,
+# unlike logging.disable() which applies to every logger in the process.
+logging.getLogger('paramiko').setLevel(logging.INFO)
+
+# Marker echoed after commands by run_in_shell(), with a token unique to
+# the call and the return code. The echoed command line shows it as
+# __DONE_<token>_$?__ so only the expanded marker matches.
+_DONE_RE = re.compile(rb'__DONE_([0-9a-f]{32})_(\d+)__')
+
+# SSH receive window advertised for new channels. Paramiko's default of
+# 2MiB can limit download throughput over high latency links. Uploads
+# are limited by the server's window instead, which this doesn't change.
+_WINDOW_SIZE = 8 * 1024 * 1024
+
+# Maximum number of concurrent SFTP sessions used by put_parallel().
+# OpenSSH allows 10 sessions per connection by default (MaxSessions),
+# which also counts the interactive channel and Fabric's SFTP session.
+_PARTS_MAX = 8
+
+# Open connections available for reuse, keyed by connection parameters.
+_POOL = {}
+_POOL_LOCK = threading.Lock()
+# Maximum number of idle connections kept per key.
+_POOL_SIZE = 8
+
+
+def _pool_get(key: tuple) -> tuple:
+    """Takes an open connection from the pool.
+
+    Args:
+        key: Connection parameters the connection was opened with.
+
+    Returns:
+        Tuple of the Fabric connection object and its interactive
+            channel, if any. Both are None if no connections are
+            available.
+    """
+    stale = []
+    try:
+        with _POOL_LOCK:
+            connections = _POOL.get(key, [])
+            while connections:
+                client, channel = connections.pop()
+                if client.is_connected:
+                    return client, channel
+                stale.append(client)
+    finally:
+        # Release the resources of connections that dropped while idle,
+        # outside the lock.
+        for client in stale:
+            client.close()
+
+    return None, None
+
+
+def _pool_put(key: tuple, client: object, channel: object = None) -> bool:
+    """Returns an open connection to the pool for reuse.
+
+    If given, the interactive channel is kept along with the connection
+    so that it doesn't need to be reopened. Any output already received
+    on the channel is discarded. Nothing is sent to the channel, so the
+    caller must know the shell is idle, see MagicSSH(pool_shell=True).
+
+    Args:
+        key: Connection parameters the connection was opened with.
+        client: Fabric connection object.
+        channel: Paramiko interactive channel for the connection.
+
+    Returns:
+        Boolean indicating whether the connection was pooled. If False,
+            the caller is responsible for closing it.
+    """
+    if not client.is_connected:
+        return False
+
+    if channel and channel.closed:
+        channel = None
+    elif channel:
+        while channel.recv_ready():
+            channel.recv(65536)
+
+    with _POOL_LOCK:
+        connections = _POOL.setdefault(key, [])
+        if len(connections) >= _POOL_SIZE:
+            return False
+        connections.append((client, channel))
+
+    return True
+
+
+class _ForwardHandler(socketserver.BaseRequestHandler):
+    """Forwards a local connection over the SSH transport.
+
+    """
+    def handle(self) -> None:
+        """Relays data between the local connection and a new channel.
+
+        """
+        try:
+            channel = self.server.transport.open_channel(
+                'direct-tcpip',
+                self.server.remote_bind_address,
+                self.request.getpeername(),
+            )
+        except (paramiko.SSHException, OSError):
+            return
+
+        # Registered so that closing the forwarder can end the relay.
+        connection = (self.request, channel)
+        with self.server.connections_lock:
+            self.server.connections.add(connection)
+
+        try:
+            while True:
+                ready, _, _ = select.select([self.request, channel], [], [])
+                if self.request in ready:
+                    data = self.request.recv(65536)
+                    if not data:
+                        break
+                    channel.sendall(data)
+                if channel in ready:
+                    data = channel.recv(65536)
+                    if not data:
+                        break
+                    self.request.sendall(data)
+        except OSError:
+            # Either end dropped the connection.
+            pass
+        finally:
+            with self.server.connections_lock:
+                self.server.connections.discard(connection)
+            channel.close()
+
+
+class _LocalForwarder(socketserver.ThreadingTCPServer):
+    """Forwards a local port to a remote address over an SSH transport.
+
+    Unlike sshtunnel, which opens a new SSH connection for every tunnel,
+    connections are forwarded over channels on an existing transport.
+    Supports the parts of the sshtunnel forwarder interface used with
+    MagicSSH tunnels so the two can be used interchangeably.
+
+    Attributes:
+        transport: Paramiko transport to open channels on.
+        local_bind_address: Local address and port being listened on.
+        remote_bind_address: Remote address and port to forward to.
+        tunnel_is_up: Tunnel status by local_bind_address, updated by
+            check_tunnels().
+        connections: Local connections and their channels currently
+            being forwarded.
+        connections_lock: Lock for connections.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        transport: object,
+        local_bind_address: tuple,
+        remote_bind_address: tuple,
+    ) -> None:
+        """Binds the local address.
+
+        Args:
+            transport: Paramiko transport to open channels on.
+            local_bind_address: Local address and port to listen on.
+            remote_bind_address: Remote address and port to forward to.
+        """
+        super().__init__(local_bind_address, _ForwardHandler)
+
+        self.transport = transport
+        self.local_bind_address = self.server_address
+        self.remote_bind_address = remote_bind_address
+        self.tunnel_is_up = {}
+        self.connections = set()
+        self.connections_lock = threading.Lock()
+
+        self.__thread = None
+
+    @property
+    def local_bind_host(self) -> str:
+        """Local address being listened on."""
+        return self.local_bind_address[0]
+
+    @property
+    def local_bind_port(self) -> int:
+        """Local port being listened on, useful if bound to port 0."""
+        return self.local_bind_address[1]
+
+    @property
+    def is_alive(self) -> bool:
+        """Whether the forwarder is accepting connections."""
+        return bool(self.__thread and self.__thread.is_alive())
+
+    @property
+    def is_active(self) -> bool:
+        """Whether the SSH transport is active."""
+        return self.transport.is_active()
+
+    def start(self) -> None:
+        """Starts accepting connections in the background.
+
+        """
+        self.__thread = threading.Thread(
+            target=self.serve_forever,
+            daemon=True,
+        )
+        self.__thread.start()
+
+    def close(self) -> None:
+        """Stops forwarding and closes the local socket.
+
+        Connections that are already being forwarded are also closed.
+        """
+        if self.__thread:
+            self.shutdown()
+        self.server_close()
+
+        with self.connections_lock:
+            connections = list(self.connections)
+
+        for request, channel in connections:
+            # Wakes the handler, which is waiting on both ends.
+            try:
+                request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            channel.close()
+
+    def stop(self) -> None:
+        """Same as close(), for compatibility with sshtunnel.
+
+        """
+        self.close()
+
+    def check_tunnels(self) -> None:
+        """Checks whether the remote address is reachable.
+
+        """
+        try:
+            channel = self.transport.open_channel(
+                'direct-tcpip',
+                self.remote_bind_address,
+                ('127.0.0.1', 0),
+                timeout=3,
+            )
+            channel.close()
+            is_up = True
+        except (paramiko.SSHException, OSError):
+            is_up = False
+
+        self.tunnel_is_up[self.local_bind_address] = is_up
+
+
 class MagicSSH:
     """SSH client using Fabric
 
@@ -34,10 +299,28 @@ class MagicSSH:
         user: str,
         port: int,
         password: str = None,
-        pkey: str = None
+        pkey: str = None,
+        pool: bool = False,
+        compress: bool = False,
+        pool_shell: bool = False,
     ) -> None:
         """Initializes the SSH client connection.
 
+        Opening a connection requires a full SSH handshake, which can
+        dominate the run time of scripts that create many short lived
+        clients for the same host. With pool=True, an open connection
+        with the same parameters is reused if available, and close()
+        returns the connection to the pool rather than closing it.
+        Use shutdown_pool() to close pooled connections.
+
+        The interactive channel used by send() and recv() is closed
+        before pooling by default. With pool_shell=True, it is pooled
+        with the connection and reused by the next client that also sets
+        pool_shell=True. Nothing checks the shell first, so any output
+        still arriving, a program left running, an elevated shell (i.e.
+        sudo -i) or a changed working directory carries over. Only use
+        this when each client leaves the shell idle.
+
         Args:
             host: Host ip address.
             user: Host user name.
@@ -46,32 +329,50 @@ class MagicSSH:
                 if applicable.
             pkey: Path to private key for host authentication,
                 if applicable.
+            pool: Whether to reuse pooled connections.
+            compress: Whether to compress SSH traffic. Useful for text
+                heavy transfers such as logs over slow links.
+            pool_shell: Whether to pool the interactive channel with the
+                connection.
         """
-        # Disable annoying debug output.
-        paramiko.util.logging.disable(level='DEBUG')
-
-        self.__config = Config()
-
         self.__host = host
         self.__user = user
         self.__port = port
         self.__password = password
         self.__pkey = pkey
 
+        self.__pool_key = None
+        self.__pool_shell = pool_shell
+
         self.client = None
         self.channel = None
         self.tunnels = []
 
+        # Config loads files and environment variables so build it once.
         if password:
             self.__config = Config(
                 overrides={'sudo': {'password': self.__password}}
             )
+        else:
+            self.__config = Config()
+
+        if pool:
+            self.__pool_key = (
+                host, user, port, password, pkey, compress, pool_shell
+            )
+            self.client, self.channel = _pool_get(self.__pool_key)
+
+        if self.client:
+            # Reusing a pooled connection.
+            pass
+        elif password:
             self.client = Connection(
                 host=host,
                 user=user,
                 port=port,
                 connect_kwargs={
                     "password": password,
+                    "compress": compress,
                 },
                 config=self.__config,
             )
@@ -83,6 +384,7 @@ class MagicSSH:
                 connect_kwargs={
                     "key_filename": pkey,
                     "look_for_keys": False,
+                    "compress": compress,
                 },
                 config=self.__config,
             )
@@ -98,6 +400,26 @@ class MagicSSH:
         except paramiko.ssh_exception.SSHException:
             pass
 
+        transport = self.client.client.get_transport()
+        if transport:
+            # Only applies to channels opened from now on and data
+            # received on them, such as get() and command output.
+            transport.default_window_size = _WINDOW_SIZE
+
+    def __open_channel(self) -> None:
+        """Opens the interactive SSH channel, if not already open.
+
+        """
+        if self.channel and not self.channel.closed:
+            return
+        elif self.channel:
+            # The channel closed, possibly due to a dropped connection.
+            self.__connect()
+
+        self.channel = self.client.client.invoke_shell()
+        self.channel.set_combine_stderr(True)
+        self.channel.setblocking(0)
+
     def send(self, s: str) -> None:
         """Sends data to the SSH channel.
 
@@ -108,35 +430,27 @@ class MagicSSH:
             s: Data to send.
         """
         # Automatically handle channel creation.
-        if not self.channel:
-            self.channel = self.client.client.invoke_shell()
-            self.channel.set_combine_stderr(True)
-            self.channel.setblocking(0)
-        elif self.channel.closed:
-            self.__connect()
-            self.channel = self.client.client.invoke_shell()
-            self.channel.set_combine_stderr(True)
-            self.channel.setblocking(0)
+        self.__open_channel()
 
         # TODO: Verify all data was sent by checking nbytes returned by send()
         self.channel.send(s)
 
-    def recv(self, nbytes: int = 1024) -> bytes:
+    def recv(self, nbytes: int = 65536) -> bytes:
         """Recieve data from the SSH channel.
 
+        Once the channel is closed, only data that was already received
+        is returned. The channel is reopened by the next send().
+
         Args:
-            nbytes: Number of bytes to receive from the channel.
+            nbytes: Maximum number of bytes to receive from the channel.
             timeout: Number of seconds to block for channel to receive
                 data. If None, channel is non-blocking.
         """
         res = None
         if not self.channel:
-            self.channel = self.client.client.invoke_shell()
-            self.channel.set_combine_stderr(True)
-            self.channel.setblocking(0)
-        elif self.channel.closed:
-            self.__connect()
-        elif self.channel.recv_ready():
+            self.__open_channel()
+
+        if self.channel.recv_ready():
             res = self.channel.recv(nbytes)
 
         return res
@@ -156,22 +470,33 @@ class MagicSSH:
             timeout: Time in seconds to read. We return sooner when
                 no data is left so this is mainly to prevent infinite
                 waits.
-            interval: Time to wait between recv() calls.
+            interval: Time to wait for more data before rechecking.
 
         Returns:
             Data received as bytes.
         """
+        if not self.channel:
+            self.__open_channel()
+
         time_start = time.time()
 
-        res_all = b''
+        # Accumulate into a mutable buffer to avoid copying all the data
+        # received so far on every read.
+        res_all = bytearray()
         # Number of times to recheck the response after recieving
         # nothing, used to indicate that we've recieved
         # everything.
         retries = 3
         while time.time() - time_start < timeout:
+            if self.channel.closed and not self.channel.recv_ready():
+                # Nothing more will arrive.
+                break
+
+            # Wait for the channel to have data rather than sleeping a
+            # fixed interval, so we wake up as soon as output arrives.
+            select.select([self.channel], [], [], interval)
             res = self.recv() or b''
             res_all += res
-            time.sleep(interval)
 
             if retries <= 0:
                 break
@@ -180,17 +505,109 @@ class MagicSSH:
             else:
                 retries = 3
 
-        return res_all
+        return bytes(res_all)
+
+    def run_in_shell(self, cmd: str, timeout: float = 15) -> tuple:
+        """Execute a shell command in the interactive SSH channel.
+
+        Unlike run(), which opens a new channel for every command, this
+        reuses the channel from send() and recv(). This avoids the channel
+        setup cost for sequences of short commands, and shell state such
+        as the working directory is kept between commands.
+
+        A marker containing the return code is echoed after the command
+        to detect when it finishes. The marker includes a token unique to
+        the call, so a marker arriving late from an earlier command that
+        timed out isn't mistaken for this one. Since the channel is
+        interactive, the output may include the terminal echo of the
+        command and prompts.
+
+        Args:
+            cmd: Command to execute.
+            timeout: Time in seconds to wait for the command to finish.
+
+        Returns:
+            Tuple of output and return code. The return code is None if
+                the command did not finish before the timeout.
+        """
+        token = uuid.uuid4().hex
+        self.send(f'{cmd}; echo __DONE_{token}_$?__\n')
+
+        time_start = time.time()
+
+        res_all = bytearray()
+        while time.time() - time_start < timeout:
+            if self.channel.closed and not self.channel.recv_ready():
+                break
+
+            select.select([self.channel], [], [], 0.25)
+            res_all += self.recv() or b''
+
+            for match in _DONE_RE.finditer(res_all):
+                if match.group(1).decode() == token:
+                    output = bytes(res_all[:match.start()])
+                    return output, int(match.group(2))
+
+        return bytes(res_all), None
 
     def close(self) -> None:
         """Terminate the network connection to the remote end, if open.
 
         If any SFTP are open, they will also be closed.
+
+        Pooled connections are returned to the pool instead, unless
+        the pool is full, and any SFTP sessions stay open with them.
+        The interactive channel used by send() and recv() is closed
+        unless pool_shell was set. Since the connection may then be used
+        by another client, this client can't be used after closing.
         """
-        self.client.close()
-        self.tunnels and [i.close() for i in self.tunnels]
+        if self.__pool_key and self.channel and not self.__pool_shell:
+            # Don't hand the shell, which may be busy, to the next user.
+            self.channel.close()
+            self.channel = None
+
+        if self.__pool_key and _pool_put(
+            self.__pool_key, self.client, self.channel
+        ):
+            # The connection belongs to the pool now.
+            self.client = None
+            self.channel = None
+        elif self.client:
+            self.client.close()
+
+        # Closing again shouldn't pool the same connection twice.
+        self.__pool_key = None
+
+        if self.tunnels:
+            # Closing a tunnel waits for its threads to stop, so close
+            # them concurrently rather than one after another.
+            with ThreadPoolExecutor(max_workers=len(self.tunnels)) as pool:
+                # Consume the results so exceptions are raised here.
+                list(pool.map(lambda i: i.close(), self.tunnels))
         self.tunnels = []
 
+    def force_close(self) -> None:
+        """Terminate the network connection to the remote end.
+
+        Same as close() except pooled connections are closed rather
+        than returned to the pool, such as when the connection is in a
+        bad state and shouldn't be reused.
+        """
+        self.__pool_key = None
+        self.close()
+
+    @staticmethod
+    def shutdown_pool() -> None:
+        """Closes all pooled connections.
+
+        """
+        with _POOL_LOCK:
+            connections = [j for i in _POOL.values() for j in i]
+            _POOL.clear()
+
+        for client, _ in connections:
+            client.close()
+
     def put(self, local: str, remote: str = None) -> None:
         """Put a local file (or file-like object) to the remote file system.
 
@@ -200,6 +617,78 @@ class MagicSSH:
         """
         self.client.put(local=local, remote=remote)
 
+    def put_parallel(
+        self,
+        local: str,
+        remote: str = None,
+        parts: int = 4,
+    ) -> None:
+        """Put a large local file to the remote file system in parts.
+
+        A single SFTP session is limited by the window the server
+        allows for it, so large uploads may not use all of the available
+        bandwidth, especially over high latency links. Here the file is
+        split into ranges which are written concurrently over separate
+        SFTP sessions on the same connection, each with its own window.
+
+        For small files, put() is simpler and just as fast.
+
+        Like put(), the file mode is preserved and if remote is a
+        directory, the file is put inside it.
+
+        Args:
+            local: Local file path.
+            remote: Destination path. This will use the OS user's home if None.
+            parts: Number of ranges to transfer concurrently. Limited to
+                8, since servers limit the number of sessions per
+                connection.
+        """
+        parts = max(1, min(parts, _PARTS_MAX))
+        sftp = self.client.sftp()
+        if not remote:
+            remote = os.path.basename(local)
+        else:
+            try:
+                if stat.S_ISDIR(sftp.stat(remote).st_mode):
+                    remote = posixpath.join(remote, os.path.basename(local))
+            except OSError:
+                # The remote file doesn't exist yet.
+                pass
+
+        size = os.path.getsize(local)
+        part_size = max(1, -(-size // parts))
+
+        # Create the remote file at its full size first so each part only
+        # has to write its own range.
+        with sftp.open(remote, 'wb') as f:
+            f.truncate(size)
+
+        def put_range(offset: int) -> None:
+            sftp = self.client.client.open_sftp()
+            try:
+                with open(local, 'rb') as src, sftp.open(remote, 'r+b') as dst:
+                    # Don't wait for the server to acknowledge each write.
+                    # Any errors are raised when the file is closed.
+                    dst.set_pipelined(True)
+                    src.seek(offset)
+                    dst.seek(offset)
+
+                    remaining = min(part_size, size - offset)
+                    while remaining > 0:
+                        data = src.read(min(remaining, 1024 * 1024))
+                        if not data:
+                            break
+                        dst.write(data)
+                        remaining -= len(data)
+            finally:
+                sftp.close()
+
+        with ThreadPoolExecutor(max_workers=parts) as pool:
+            # Consume the results so exceptions are raised here.
+            list(pool.map(put_range, range(0, size, part_size)))
+
+        sftp.chmod(remote, stat.S_IMODE(os.stat(local).st_mode))
+
     def get(self, remote: str, local: str = None) -> None:
         """Get a remote file to the local filesystem or file-like object.
 
@@ -229,6 +718,78 @@ class MagicSSH:
 
         return result.stdout, result.return_code
 
+    def run_fast(self, cmd: str) -> tuple:
+        """Execute a shell command on the remote end with less overhead.
+
+        Fabric's run() sets up stream handling and watchers intended for
+        interactive use, which adds noticeable overhead to short commands.
+        When only the output and return code are needed, this executes the
+        command directly on a new Paramiko channel instead.
+
+        Like run(), stdout and stderr are combined. Unlike run(), a
+        non-zero return code does not raise an exception.
+
+        Args:
+            cmd: Command to execute.
+
+        Returns:
+            Tuple of output and return code.
+        """
+        if not self.client.is_connected:
+            self.__connect()
+
+        channel = self.client.client.get_transport().open_session()
+        try:
+            channel.set_combine_stderr(True)
+            channel.exec_command(cmd)
+            output = b''.join(iter(lambda: channel.recv(65536), b''))
+            return_code = channel.recv_exit_status()
+        finally:
+            channel.close()
+
+        return output.decode('utf-8', 'replace'), return_code
+
+    def run_many(self, cmds: list) -> list:
+        """Execute several shell commands on the remote end at once.
+
+        Each run() opens a new channel on the connection. For sequences
+        of short commands, this setup can take longer than the commands
+        themselves. Here the commands are combined into a single shell
+        command so they share one channel, then the output is split back
+        up per command.
+
+        Commands run in order in separate subshells, regardless of the
+        return code of the previous command. Output containing NUL
+        characters is not supported since these are used to separate the
+        output of each command.
+
+        Each command is wrapped as `( cmd ) ; printf ...` so it must be
+        complete on its own. A command ending in a # comment or with an
+        unterminated heredoc swallows the rest of the line, which makes
+        the whole batch fail with a shell syntax error and raise.
+
+        Args:
+            cmds: Commands to execute.
+
+        Returns:
+            List of tuples of output and return code for each command.
+        """
+        if not cmds:
+            return []
+
+        # Follow each command's output with its return code, delimited
+        # by NUL characters.
+        joined = ' ; '.join(
+            f'( {i} ) ; printf "\\0%d\\0" "$?"' for i in cmds
+        )
+        result = self.client.run(joined, hide=True)
+
+        fields = result.stdout.split('\0')
+        return [
+            (fields[i], int(fields[i + 1]))
+            for i in range(0, len(cmds) * 2, 2)
+        ]
+
     def sudo(self, cmd: str) -> tuple:
         """Execute a shell command, via ``sudo``, on the remote end.
 
@@ -260,7 +821,10 @@ class MagicSSH:
         - self.tunnel.is_active
 
         Due to a lack of success with Fabric's forward_local() method,
-        this method uses similar naming but wraps sshtunnel instead.
+        this method uses similar naming but forwards connections over
+        the existing SSH connection instead. This avoids a new SSH
+        handshake for each tunnel. If the connection isn't active,
+        sshtunnel is used to open a separate connection.
 
         Args:
             local_port: Local port to forward.
@@ -272,6 +836,23 @@ class MagicSSH:
             Boolean indicating whether a tunnel could be started.
 
         """
+        transport = self.client.client.get_transport()
+        if transport and transport.is_active():
+            try:
+                tunnel = _LocalForwarder(
+                    transport,
+                    (local_host, local_port),
+                    (remote_host, remote_port),
+                )
+            except OSError:
+                # Could not bind the local port.
+                return None
+
+            tunnel.start()
+            self.tunnels.append(tunnel)
+
+            return len(self.tunnels) - 1
+
         try:
             # Close any existing tunnels.
             self.tunnels.append(
@@ -308,3 +889,76 @@ class MagicSSH:
             )
 
         return status
+
+
+def _call_parallel(
+    clients: list,
+    method: str,
+    cmd: str,
+    max_workers: int,
+) -> list:
+    """Calls a MagicSSH method on several clients concurrently.
+
+    Args:
+        clients: MagicSSH clients to call the method on.
+        method: Name of the method (i.e. 'run').
+        cmd: Command to pass to the method.
+        max_workers: Maximum number of clients to call at once.
+
+    Returns:
+        List of results in the same order as clients. If the call raised
+            an exception for a client, such as a non-zero return code or
+            an unreachable host, the exception is returned in its place
+            so other clients' results aren't lost.
+    """
+    if not clients:
+        return []
+
+    def call(client: MagicSSH) -> object:
+        try:
+            return getattr(client, method)(cmd)
+        except Exception as e:
+            return e
+
+    workers = min(max_workers, len(clients))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(call, clients))
+
+
+def run_parallel(clients: list, cmd: str, max_workers: int = 32) -> list:
+    """Execute a shell command on several remote hosts concurrently.
+
+    Running a command across many hosts one at a time is dominated by
+    waiting on the network. Since Paramiko releases the GIL while
+    waiting, threads let these waits overlap so the total time is close
+    to that of the slowest host rather than the sum of all of them.
+
+    Args:
+        clients: MagicSSH clients to run the command on.
+        cmd: Command to execute.
+        max_workers: Maximum number of hosts to run on at once.
+
+    Returns:
+        List of tuples of output and return code, in the same order as
+            clients. Hosts where run() raised, such as for a non-zero
+            return code, have the exception instead.
+    """
+    return _call_parallel(clients, 'run', cmd, max_workers)
+
+
+def sudo_parallel(clients: list, cmd: str, max_workers: int = 32) -> list:
+    """Execute a shell command, via ``sudo``, on several remote hosts.
+
+    See run_parallel().
+
+    Args:
+        clients: MagicSSH clients to run the command on.
+        cmd: Command to execute.
+        max_workers: Maximum number of hosts to run on at once.
+
+    Returns:
+        List of tuples of output and return code, in the same order as
+            clients. Hosts where sudo() raised have the exception
+            instead.
+    """
+    return _call_parallel(clients, 'sudo', cmd, max_workers)
@@ -1,11 +1,18 @@
 import os
 import time
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import redfish
 import requests
 
 
+# Number of HTTP connections the redfish library keeps per host. Requests
+# sent concurrently beyond this open connections that are then discarded.
+_HTTP_POOL_SIZE = 6
+
+
 class RedFish:
     """Redfish client wrapper.
 
@@ -36,39 +43,63 @@ class RedFish:
         self.__password = password
 
         self.prefix = '/redfish/v1'
+        # Serializes re-authentication between concurrent requests.
+        self.__auth_lock = threading.Lock()
         self.__auth()
 
     def __auth(self) -> None:
         """Establishes client Redfish connection.
 
         """
-        self.client = redfish.redfish_client(
+        client = redfish.redfish_client(
             base_url=f'https://{self.__hostname}',
             username=self.__username,
             password=self.__password,
             default_prefix=self.prefix
         )
-        self.client.login(auth='session')
+        client.login(auth='session')
+        # Only replace the client once logged in, since other threads
+        # may be sending requests with it.
+        self.client = client
 
-    def get(self, *args, **kwargs) -> object:
-        """Perform a GET request.
+    def __request(self, method: str, *args, **kwargs) -> object:
+        """Perform a request, re-authenticating if the session expired.
 
-        Convenience wrapper for redfish.redfish_client.get that handles
-        re-authentication.
+        Requests may be sent concurrently, in which case they all fail
+        once the session times out. Only the first to notice logs in
+        again and the rest retry with the new session, rather than each
+        creating its own. BMCs often limit the number of sessions.
+
+        Args:
+            method: Name of the redfish client method (i.e. 'get').
 
         Returns:
-            returns a rest request with method 'Get'
+            Rest response from the redfish client method.
         """
-        res = self.client.get(*args, **kwargs)
+        client = self.client
+        res = getattr(client, method)(*args, **kwargs)
 
         # The session probably timed out. Need to re-authenticate.
         if res.status == 401:
-            self.__auth()
+            with self.__auth_lock:
+                if self.client is client:
+                    self.__auth()
             # Try the request again
-            res = self.client.get(*args, **kwargs)
+            res = getattr(self.client, method)(*args, **kwargs)
 
         return res
 
+    def get(self, *args, **kwargs) -> object:
+        """Perform a GET request.
+
+        Convenience wrapper for redfish.redfish_client.get that handles
+        re-authentication.
+
+        Returns:
+            returns a rest request with method 'Get'
+        """
+        return self.__request('get', *args, **kwargs)
+
     def patch(self, *args, **kwargs) -> object:
         """Perform a PATCH request.
 
@@ -78,15 +109,7 @@ class RedFish:
         Returns:
             returns a rest request with method 'Patch'
         """
-        res = self.client.patch(*args, **kwargs)
-
-        # The session probably timed out. Need to re-authenticate.
-        if res.status == 401:
-            self.__auth()
-            # Try the request again
-            res = self.client.patch(*args, **kwargs)
-
-        return res
+        return self.__request('patch', *args, **kwargs)
 
     def post(self, *args, **kwargs) -> object:
         """Perform a POST request.
@@ -97,15 +120,7 @@ class RedFish:
         Returns:
             returns a rest request with method 'Post'
         """
-        res = self.client.post(*args, **kwargs)
-
-        # The session probably timed out. Need to re-authenticate.
-        if res.status == 401:
-            self.__auth()
-            # Try the request again
-            res = self.client.post(*args, **kwargs)
-
-        return res
+        return self.__request('post', *args, **kwargs)
 
     def put(self, *args, **kwargs) -> object:
         """Perform a PUT request.
@@ -116,15 +131,7 @@ class RedFish:
         Returns:
             returns a rest request with method 'Put'
         """
-        res = self.client.put(*args, **kwargs)
-
-        # The session probably timed out. Need to re-authenticate.
-        if res.status == 401:
-            self.__auth()
-            # Try the request again
-            res = self.client.put(*args, **kwargs)
-
-        return res
+        return self.__request('put', *args, **kwargs)
 
     def get_system_list(self) -> list:
         """Gets list of Redfish systems
@@ -223,14 +230,23 @@ class RedFish:
 
         members = response.dict.get('Members', [])
 
-        for i in members:
-            # Every boot option has a uri with extra info.
-            uri = i.get('@odata.id')
-            # Make a new request to get the name and id.
-            r = self.get(uri)
+        # Every boot option has a uri with extra info.
+        uris = [i.get('@odata.id') for i in members]
+
+        responses = []
+        if uris:
+            # Make a new request for each option to get the name and id.
+            # These are independent so send them concurrently rather than
+            # waiting on each round trip in turn.
+            workers = min(_HTTP_POOL_SIZE, len(uris))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                responses = list(pool.map(self.get, uris))
 
-            boot_id = r.dict.get('Id', '')
-            boot_name = r.dict.get('DisplayName', '')
+        for r in responses:
+            # Decode the response body once.
+            option = r.dict
+            boot_id = option.get('Id', '')
+            boot_name = option.get('DisplayName', '')
 
             # Append the id and name as a tuple.
             # Most applications probably only care for these 2 anyway
@@ -353,21 +369,24 @@ class RedFish:
             )
             # Expects a response with the 'TaskState' of 'Running'
             # otherwise we don't step into the loop.
-            res.dict = json.loads(res.text)
-            task_id = res.dict.get('Id')
+            # Response bodies are decoded once per request since the
+            # redfish response dict property parses the JSON every time
+            # it's accessed.
+            task = json.loads(res.text)
+            task_id = task.get('Id')
             task_uri = f"{self.prefix}/TaskService/Tasks/{task_id}"
             while all([
-                res.dict.get('PercentComplete', 0) < 100,
-                res.dict.get('TaskState', '').lower() == 'running',
+                task.get('PercentComplete', 0) < 100,
+                task.get('TaskState', '').lower() == 'running',
             ]):
                 # The task is not done so we'll wait and check on it.
                 time.sleep(30)
-                res = self.get(task_uri)
+                task = self.get(task_uri).dict
 
             if all([
-                res.dict.get('PercentComplete', 0) == 100,
-                res.dict.get('TaskState', '').lower() == 'completed',
-                res.dict.get('TaskStatus', '').lower() == 'ok',
+                task.get('PercentComplete', 0) == 100,
+                task.get('TaskState', '').lower() == 'completed',
+                task.get('TaskStatus', '').lower() == 'ok',
             ]):
                 return True
 
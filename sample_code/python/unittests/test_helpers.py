@@ -0,0 +1,147 @@
+import os
+import socket
+import time
+import unittest
+from unittest.mock import patch
+
+import helpers
+from helpers import failsafe, host_run_iter, is_host_reachable, wait_for_boot
+from helpers import wait_for_shutdown
+
+
+class TestHelpers(unittest.TestCase):
+
+    def test_failsafe_returns_value(self):
+        @failsafe
+        def add(a, b):
+            return a + b
+
+        assert add(1, 2) == 3
+        assert add.__name__ == 'add'
+
+    def test_failsafe_swallows_exception(self):
+        @failsafe
+        def broken():
+            raise ValueError
+
+        assert broken() is None
+
+    def test_host_run_iter(self):
+        def run():
+            cmd = 'echo foo; echo bar; exit 3'
+            return_code = yield from host_run_iter(cmd)
+            assert return_code == 3
+
+        assert list(run()) == ['foo\n', 'bar\n']
+
+    def test_host_run_iter_stop_kills_children(self):
+        lines = host_run_iter('sleep 30 & echo $!; wait')
+        pid = int(next(lines))
+        lines.close()
+
+        # The killed sleep lingers until it is reaped.
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                break
+            time.sleep(0.05)
+        else:
+            self.fail('background command was not killed')
+
+    def test_host_run_iter_exception_kills_command(self):
+        lines = host_run_iter('echo start; sleep 30; echo done')
+        next(lines)
+
+        start = time.monotonic()
+        with self.assertRaises(KeyboardInterrupt):
+            lines.throw(KeyboardInterrupt)
+
+        assert time.monotonic() - start < 5
+
+    def test_host_reachable(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
+            server.bind(('127.0.0.1', 0))
+            server.listen()
+            port = server.getsockname()[1]
+
+            assert is_host_reachable('127.0.0.1', port) is True
+
+    @patch('helpers.socket.socket', autospec=True)
+    def test_host_unreachable(self, mock_socket):
+        sock = mock_socket.return_value.__enter__.return_value
+        sock.connect_ex.return_value = 111
+
+        assert is_host_reachable('127.0.0.1', 22) is False
+
+    @patch('helpers.time.sleep')
+    @patch('helpers.is_host_reachable')
+    def test_wait_for_boot_pass(self, mock_reachable, mock_sleep):
+        mock_reachable.side_effect = [False, False, True]
+
+        assert wait_for_boot('127.0.0.1') is True
+        # SSH came up so RDP is never checked.
+        assert mock_reachable.call_count == 3
+        mock_sleep.assert_called_once()
+
+    @patch('helpers.time.sleep')
+    @patch('helpers.is_host_reachable', return_value=False)
+    def test_wait_for_boot_resolves_each_check(
+        self, mock_reachable, mock_sleep
+    ):
+        mock_sleep.side_effect = [None, StopIteration]
+
+        with self.assertRaises(StopIteration):
+            wait_for_boot('myhost')
+
+        # The hostname is passed through so each check resolves it.
+        mock_reachable.assert_called_with('myhost', 3389)
+
+    @patch('helpers.time.sleep')
+    @patch('helpers.is_host_reachable', return_value=False)
+    def test_wait_for_boot_fail(self, mock_reachable, mock_sleep):
+        assert wait_for_boot('127.0.0.1', timeout=0) is False
+
+    @patch('helpers.time.sleep')
+    @patch('helpers._any_port_open')
+    def test_wait_for_shutdown_pass(self, mock_open, mock_sleep):
+        mock_open.side_effect = [True, True, False]
+
+        assert wait_for_shutdown('127.0.0.1') is True
+        # Delay between checks backs off.
+        assert [i.args[0] for i in mock_sleep.call_args_list] == [0.05, 0.1]
+
+    @patch('helpers.time.sleep')
+    @patch('helpers._any_port_open', return_value=True)
+    @patch('helpers.socket.getaddrinfo')
+    def test_wait_for_shutdown_resolves_once(
+        self, mock_getaddrinfo, mock_open, mock_sleep
+    ):
+        mock_getaddrinfo.return_value = [
+            (None, None, None, '', ('10.0.0.5', 0))
+        ]
+        mock_sleep.side_effect = [None, None, StopIteration]
+
+        with self.assertRaises(StopIteration):
+            wait_for_shutdown('myhost')
+
+        mock_getaddrinfo.assert_called_once()
+        mock_open.assert_called_with('10.0.0.5', helpers._PROBE_PORTS)
+
+    @patch('helpers.time.sleep')
+    @patch('helpers._any_port_open', return_value=True)
+    def test_wait_for_shutdown_fail(self, mock_open, mock_sleep):
+        assert wait_for_shutdown('127.0.0.1', timeout=0) is False
+
+    def test_any_port_open(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
+            server.bind(('127.0.0.1', 0))
+            server.listen()
+            port = server.getsockname()[1]
+
+            assert helpers._any_port_open('127.0.0.1', (1, port)) is True
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,297 @@
+import os
+import queue
+import select
+import socket
+import stat
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import magicssh
+from magicssh import MagicSSH
+
+
+class FakeTransport(object):
+    """Transport whose channels are connected socket pairs."""
+
+    def __init__(self):
+        self.fail = False
+        self.remotes = queue.Queue()
+
+    def is_active(self):
+        return True
+
+    def open_channel(self, kind, dest_addr, src_addr, timeout=None):
+        if self.fail:
+            raise OSError('Connection refused')
+
+        channel, remote = socket.socketpair()
+        self.remotes.put(remote)
+
+        return channel
+
+
+class ShellChannel(object):
+    """Channel connected to a local shell."""
+
+    def __init__(self):
+        self.proc = subprocess.Popen(
+            ['sh'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+
+    @property
+    def closed(self):
+        return self.proc.poll() is not None
+
+    def fileno(self):
+        return self.proc.stdout.fileno()
+
+    def send(self, s):
+        self.proc.stdin.write(s.encode())
+        self.proc.stdin.flush()
+
+    def recv_ready(self):
+        return bool(select.select([self.proc.stdout], [], [], 0)[0])
+
+    def recv(self, nbytes):
+        return os.read(self.fileno(), nbytes)
+
+    def close(self):
+        self.proc.kill()
+        self.proc.wait()
+        self.proc.stdin.close()
+        self.proc.stdout.close()
+
+
+class TestLocalForwarder(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = FakeTransport()
+        self.tunnel = magicssh._LocalForwarder(
+            self.transport, ('127.0.0.1', 0), ('10.0.0.1', 80)
+        )
+        self.tunnel.start()
+
+    def tearDown(self):
+        self.tunnel.close()
+
+    def test_forward(self):
+        with socket.create_connection(
+            self.tunnel.local_bind_address, timeout=5
+        ) as sock:
+            remote = self.transport.remotes.get(timeout=5)
+            remote.settimeout(5)
+
+            sock.sendall(b'ping')
+            assert remote.recv(4) == b'ping'
+
+            remote.sendall(b'pong')
+            assert sock.recv(4) == b'pong'
+
+            # Closing the remote end closes the local connection.
+            remote.close()
+            assert sock.recv(4) == b''
+
+    def test_check_tunnels_up(self):
+        self.tunnel.check_tunnels()
+
+        address = self.tunnel.local_bind_address
+        assert self.tunnel.tunnel_is_up[address] is True
+
+    def test_check_tunnels_down(self):
+        self.transport.fail = True
+        self.tunnel.check_tunnels()
+
+        address = self.tunnel.local_bind_address
+        assert self.tunnel.tunnel_is_up[address] is False
+
+    def test_local_bind_port(self):
+        host, port = self.tunnel.local_bind_address
+
+        assert self.tunnel.local_bind_host == host
+        assert self.tunnel.local_bind_port == port != 0
+
+    def test_close_forwarded_connections(self):
+        with socket.create_connection(
+            self.tunnel.local_bind_address, timeout=5
+        ) as sock:
+            remote = self.transport.remotes.get(timeout=5)
+            remote.settimeout(5)
+
+            self.tunnel.stop()
+
+            assert sock.recv(4) == b''
+            assert remote.recv(4) == b''
+            remote.close()
+
+    def test_close(self):
+        address = self.tunnel.local_bind_address
+        assert self.tunnel.is_alive
+
+        self.tunnel.close()
+
+        assert not self.tunnel.is_alive
+        with self.assertRaises(ConnectionRefusedError):
+            socket.create_connection(address, timeout=5)
+
+
+class TestMagicSSH(unittest.TestCase):
+
+    def tearDown(self):
+        magicssh._POOL.clear()
+
+    @patch('magicssh.Connection')
+    def test_close_pooled_twice(self, mock_connection):
+        mock_connection.side_effect = lambda **kwargs: MagicMock()
+
+        a = MagicSSH('127.0.0.1', 'user', 22, password='password', pool=True)
+        client = a.client
+        a.close()
+        a.close()
+
+        assert a.client is None
+        b = MagicSSH('127.0.0.1', 'user', 22, password='password', pool=True)
+        c = MagicSSH('127.0.0.1', 'user', 22, password='password', pool=True)
+
+        # The connection was only pooled once.
+        assert b.client is client
+        assert c.client is not client
+
+    @patch('magicssh.Connection')
+    def test_pool_get_closes_stale(self, mock_connection):
+        stale = MagicMock(is_connected=False)
+        key = ('127.0.0.1', 'user', 22, 'password', None, False, False)
+        magicssh._POOL[key] = [(stale, None)]
+
+        ssh = MagicSSH('127.0.0.1', 'user', 22, password='password', pool=True)
+
+        stale.close.assert_called_once()
+        assert ssh.client is mock_connection.return_value
+
+    @patch('magicssh.Connection')
+    def test_close_pooled_closes_shell(self, mock_connection):
+        channel = MagicMock(closed=False)
+
+        a = MagicSSH('127.0.0.1', 'user', 22, password='password', pool=True)
+        a.channel = channel
+        a.close()
+
+        b = MagicSSH('127.0.0.1', 'user', 22, password='password', pool=True)
+
+        channel.close.assert_called_once()
+        assert b.channel is None
+
+    @patch('magicssh.Connection')
+    def test_close_pooled_keeps_shell(self, mock_connection):
+        channel = MagicMock(closed=False)
+        channel.recv_ready.return_value = False
+
+        a = MagicSSH(
+            '127.0.0.1', 'user', 22, password='password', pool=True,
+            pool_shell=True,
+        )
+        a.channel = channel
+        a.close()
+
+        b = MagicSSH(
+            '127.0.0.1', 'user', 22, password='password', pool=True,
+            pool_shell=True,
+        )
+
+        # Nothing is written to the shell to check it.
+        channel.send.assert_not_called()
+        channel.close.assert_not_called()
+        assert b.channel is channel
+
+    @patch('magicssh.Connection')
+    def test_run_in_shell(self, mock_connection):
+        ssh = MagicSSH('127.0.0.1', 'user', 22, password='password')
+        ssh.channel = ShellChannel()
+        self.addCleanup(ssh.channel.close)
+
+        # Output that looks like a marker doesn't end the command.
+        res = ssh.run_in_shell('echo __DONE_0__; echo foo; (exit 3)')
+        assert res == (b'__DONE_0__\nfoo\n', 3)
+
+    @patch('magicssh.Connection')
+    def test_run_in_shell_after_timeout(self, mock_connection):
+        ssh = MagicSSH('127.0.0.1', 'user', 22, password='password')
+        ssh.channel = ShellChannel()
+        self.addCleanup(ssh.channel.close)
+
+        assert ssh.run_in_shell('sleep 1', timeout=0.1)[1] is None
+
+        # The marker from the timed out command arrives first.
+        assert ssh.run_in_shell('(exit 7)')[1] == 7
+
+    @patch('magicssh.Connection')
+    def test_put_parallel_to_directory(self, mock_connection):
+        sftp = mock_connection.return_value.sftp.return_value
+        sftp.stat.return_value.st_mode = stat.S_IFDIR | 0o755
+
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(b'foo' * 1024)
+            f.flush()
+            os.chmod(f.name, 0o751)
+
+            ssh = MagicSSH('127.0.0.1', 'user', 22, password='password')
+            ssh.put_parallel(f.name, '/tmp/dir', parts=20)
+
+            remote = '/tmp/dir/' + os.path.basename(f.name)
+
+        sftp.open.assert_called_once_with(remote, 'wb')
+        sftp.chmod.assert_called_once_with(remote, 0o751)
+        # Sessions are limited to what servers allow by default.
+        open_sftp = mock_connection.return_value.client.open_sftp
+        assert open_sftp.call_count == 8
+
+    @patch('magicssh.Connection')
+    def test_run_many(self, mock_connection):
+        mock_client = mock_connection.return_value
+        mock_client.run.return_value.stdout = (
+            'foo\n\x000\x00\x000\x00bar\n\x002\x00'
+        )
+
+        ssh = MagicSSH('127.0.0.1', 'user', 22, password='password')
+        res = ssh.run_many(['echo foo', 'true', 'echo bar; exit 2'])
+
+        mock_client.run.assert_called_once()
+        assert res == [('foo\n', 0), ('', 0), ('bar\n', 2)]
+
+    @patch('magicssh.Connection')
+    def test_run_many_no_cmds(self, mock_connection):
+        mock_client = mock_connection.return_value
+
+        ssh = MagicSSH('127.0.0.1', 'user', 22, password='password')
+
+        assert ssh.run_many([]) == []
+        mock_client.run.assert_not_called()
+
+    def test_run_parallel_keeps_results_on_error(self):
+        error = RuntimeError('unreachable')
+        clients = [MagicMock(), MagicMock(), MagicMock()]
+        clients[0].run.return_value = ('foo\n', 0)
+        clients[1].run.side_effect = error
+        clients[2].run.return_value = ('bar\n', 0)
+
+        res = magicssh.run_parallel(clients, 'hostname')
+
+        assert res == [('foo\n', 0), error, ('bar\n', 0)]
+
+    def test_sudo_parallel(self):
+        clients = [MagicMock(), MagicMock()]
+        clients[0].sudo.return_value = ('foo\n', 0)
+        clients[1].sudo.return_value = ('bar\n', 0)
+
+        res = magicssh.sudo_parallel(clients, 'hostname')
+
+        assert res == [('foo\n', 0), ('bar\n', 0)]
+        clients[0].run.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
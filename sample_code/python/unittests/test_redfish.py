@@ -1,9 +1,10 @@
+import threading
 import unittest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import redfish
 
-from redfish_clients import RedFish
+from redfish_client import RedFish
 
 
 class MockResponse(object):
@@ -15,15 +16,15 @@ class TestRedFish(unittest.TestCase):
     def test_correct_redfish(self):
         assert hasattr(redfish, 'redfish_client')
 
-    @patch('lib.remix.redfish_helpers.redfish', autospec=True)
+    @patch('redfish_client.redfish')
     def test_system_list_with_members(self, mock_redfish):
         res = MockResponse()
         res.status = 200
         res.dict = {
             'Members': [
-                {'@odata.id': '/redfish/v1/Systems/0'},
-                {'@odata.id': '/redfish/v1/Systems/1'},
-                {'@odata.id': '/redfish/v1/Systems/2'},
+                {'@odata.id': '/redfish/v1/Systems/0', 'Id': '0'},
+                {'@odata.id': '/redfish/v1/Systems/1', 'Id': '1'},
+                {'@odata.id': '/redfish/v1/Systems/2', 'Id': '2'},
             ]
         }
 
@@ -36,7 +37,7 @@ class TestRedFish(unittest.TestCase):
         mock_client.get.assert_called_once()
         assert systems == ['0', '1', '2']
 
-    @patch('lib.remix.redfish_helpers.redfish', autospec=True)
+    @patch('redfish_client.redfish')
     def test_system_list_no_members(self, mock_redfish):
         res = MockResponse()
         res.status = 200
@@ -51,7 +52,7 @@ class TestRedFish(unittest.TestCase):
         mock_client.get.assert_called_once()
         assert systems == []
 
-    @patch('lib.remix.redfish_helpers.redfish', autospec=True)
+    @patch('redfish_client.redfish')
     def test_get_resets_with_types(self, mock_redfish):
         res = MockResponse()
         res.status = 200
@@ -71,7 +72,7 @@ class TestRedFish(unittest.TestCase):
         mock_client.get.assert_called_once()
         assert resets == ['On', 'ForceOff', 'ForceOn']
 
-    @patch('lib.remix.redfish_helpers.redfish', autospec=True)
+    @patch('redfish_client.redfish')
     def test_get_resets_no_types(self, mock_redfish):
         res = MockResponse()
         res.status = 200
@@ -89,7 +90,7 @@ class TestRedFish(unittest.TestCase):
         mock_client.get.assert_called_once()
         assert resets == []
 
-    @patch('lib.remix.redfish_helpers.redfish', autospec=True)
+    @patch('redfish_client.redfish')
     def test_reset_system_pass(self, mock_redfish):
         res = MockResponse()
         res.status = 200
@@ -108,7 +109,7 @@ class TestRedFish(unittest.TestCase):
         mock_client.post.assert_called_once()
         assert status is True
 
-    @patch('lib.remix.redfish_helpers.redfish', autospec=True)
+    @patch('redfish_client.redfish')
     def test_reset_system_fail(self, mock_redfish):
         res = MockResponse()
         res.status = 200
@@ -125,7 +126,7 @@ class TestRedFish(unittest.TestCase):
         mock_client.post.assert_called_once()
         assert status is False
 
-    @patch('lib.remix.redfish_helpers.redfish', autospec=True)
+    @patch('redfish_client.redfish')
     def test_get_boot_opts(self, mock_redfish):
         res_0 = MockResponse()
         res_1 = MockResponse()
@@ -153,7 +154,7 @@ class TestRedFish(unittest.TestCase):
         mock_client.get.assert_called()
         assert boot_options == [('Boot0001', 'first boot')]
 
-    @patch('lib.remix.redfish_helpers.redfish', autospec=True)
+    @patch('redfish_client.redfish')
     def test_get_boot_no_opts(self, mock_redfish):
         res_0 = MockResponse()
 
@@ -171,6 +172,62 @@ class TestRedFish(unittest.TestCase):
         mock_client.get.assert_called_once()
         assert boot_options == []
 
+    @patch('redfish_client.redfish')
+    def test_get_reauth(self, mock_redfish):
+        res_0 = MockResponse()
+        res_1 = MockResponse()
+
+        res_0.status = 401
+        res_1.status = 200
+
+        mock_client = mock_redfish.redfish_client.return_value
+        mock_client.get.side_effect = [res_0, res_1]
+
+        rf = RedFish('123', 'user', 'password')
+        res = rf.get('/redfish/v1')
+
+        # Logged in once on init and again after the 401.
+        assert mock_redfish.redfish_client.call_count == 2
+        assert res is res_1
+
+    @patch('redfish_client.redfish')
+    def test_get_boot_opts_reauth_once(self, mock_redfish):
+        members = MockResponse()
+        members.status = 200
+        members.dict = {
+            'Members': [
+                {'@odata.id': f'/foo/bar/Boot000{i}'} for i in range(6)
+            ]
+        }
+        expired = MockResponse()
+        expired.status = 401
+        option = MockResponse()
+        option.status = 200
+        option.dict = {'DisplayName': 'boot', 'Id': 'Boot0000'}
+
+        # The session expires after listing the boot options, so every
+        # concurrent request for an option fails at once.
+        barrier = threading.Barrier(6, timeout=5)
+
+        def old_get(uri):
+            if uri.endswith('/BootOptions'):
+                return members
+            barrier.wait()
+            return expired
+
+        old_client = MagicMock()
+        old_client.get.side_effect = old_get
+        new_client = MagicMock()
+        new_client.get.return_value = option
+        mock_redfish.redfish_client.side_effect = [old_client, new_client]
+
+        rf = RedFish('123', 'user', 'password')
+        boot_options = rf.get_boot_options('0')
+
+        # Logged in once on init and only once more for all requests.
+        assert mock_redfish.redfish_client.call_count == 2
+        assert boot_options == [('Boot0000', 'boot')] * 6
+
 
 if __name__ == '__main__':
     unittest.main()